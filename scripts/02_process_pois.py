@@ -2,8 +2,9 @@ import sys
 import logging
 from pathlib import Path
 sys.path.append('scripts')
-from utils.osm_helper import (load_config, extract_pois, categorize_pois, 
-                             clean_data, save_geospatial_data, save_tabular_data)
+from utils.osm_helper import (load_config, extract_pois, categorize_pois,
+                             clean_data, save_geospatial_data, save_tabular_data,
+                             strip_sparse_columns, POI_KEEP_COLUMNS)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -27,7 +28,10 @@ def main():
     
     # Categorize POIs
     pois = categorize_pois(pois)
-    
+
+    # Drop mostly-empty tag columns to cut downstream IO
+    pois = strip_sparse_columns(pois, keep=POI_KEEP_COLUMNS)
+
     # Clean data
     pois = clean_data(pois)
     
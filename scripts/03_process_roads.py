@@ -2,8 +2,9 @@ import sys
 import logging
 from pathlib import Path
 sys.path.append('scripts')
-from utils.osm_helper import (load_config, extract_roads, clean_data, 
-                             save_geospatial_data, save_tabular_data)
+from utils.osm_helper import (load_config, extract_roads, clean_data,
+                             save_geospatial_data, save_tabular_data,
+                             strip_sparse_columns)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -25,6 +26,14 @@ def main():
         logger.error("Failed to extract roads")
         return False
     
+    # Drop mostly-empty tag columns to cut downstream IO
+    roads = strip_sparse_columns(roads, keep=['highway', 'name'])
+    nodes = strip_sparse_columns(nodes)
+
+    # Road types have low cardinality, so count them over category codes
+    if 'highway' in roads.columns:
+        roads['highway'] = roads['highway'].astype('category')
+
     # Clean data
     roads = clean_data(roads)
     nodes = clean_data(nodes)
@@ -2,6 +2,8 @@ import sys
 import logging
 import pandas as pd
 import geopandas as gpd
+import pyogrio
+import shapely
 from pathlib import Path
 sys.path.append('scripts')
 from utils.osm_helper import load_config
@@ -9,51 +11,74 @@ from utils.osm_helper import load_config
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def create_restaurant_dataset(pois_gdf):
-    """Create restaurant dataset"""
-    restaurants = pois_gdf[pois_gdf['category'] == 'food_beverage'].copy()
-    
-    if len(restaurants) == 0:
+def apply_field_defaults(df, defaults):
+    """Add missing columns with defaults in one assign; fill NaNs on the rest
+
+    DataFrame.get returns a scalar when the column is absent, and assigning
+    that scalar back broadcasts it over the whole frame, so the previous
+    get()-based pattern was both a silent-clobber risk and a per-column copy.
+    """
+    missing = {col: default for col, default in defaults.items()
+               if col not in df.columns}
+    if missing:
+        df = df.assign(**missing)
+    for col in defaults.keys() - missing.keys():
+        df[col] = df[col].fillna(defaults[col])
+    return df
+
+def create_restaurant_dataset(restaurants):
+    """Create restaurant dataset from the food_beverage POI subset"""
+    if restaurants is None or len(restaurants) == 0:
         return None
-    
+
+    restaurants = restaurants.copy()
+
     # Add restaurant-specific fields
-    restaurants['cuisine'] = restaurants.get('cuisine', 'unknown')
-    restaurants['opening_hours'] = restaurants.get('opening_hours', 'unknown')
-    restaurants['phone'] = restaurants.get('phone', '')
-    restaurants['website'] = restaurants.get('website', '')
-    restaurants['takeaway'] = restaurants.get('takeaway', 'unknown')
-    restaurants['delivery'] = restaurants.get('delivery', 'unknown')
-    
+    restaurants = apply_field_defaults(restaurants, {
+        'cuisine': 'unknown',
+        'opening_hours': 'unknown',
+        'phone': '',
+        'website': '',
+        'takeaway': 'unknown',
+        'delivery': 'unknown'
+    })
+
     logger.info(f"Created restaurant dataset: {len(restaurants)} restaurants")
     return restaurants
 
-def create_retail_dataset(pois_gdf):
-    """Create retail dataset"""
-    retail = pois_gdf[pois_gdf['category'] == 'retail'].copy()
-    
-    if len(retail) == 0:
+def create_retail_dataset(retail):
+    """Create retail dataset from the retail POI subset"""
+    if retail is None or len(retail) == 0:
         return None
-    
+
+    retail = retail.copy()
+
     # Add retail-specific fields
-    retail['shop_type'] = retail.get('shop', 'unknown')
-    retail['brand'] = retail.get('brand', 'independent')
-    retail['opening_hours'] = retail.get('opening_hours', 'unknown')
+    retail['shop_type'] = (retail['shop'].fillna('unknown')
+                           if 'shop' in retail.columns else 'unknown')
+    retail = apply_field_defaults(retail, {
+        'brand': 'independent',
+        'opening_hours': 'unknown'
+    })
     
     logger.info(f"Created retail dataset: {len(retail)} shops")
     return retail
 
-def create_healthcare_dataset(pois_gdf):
-    """Create healthcare dataset"""
-    healthcare = pois_gdf[pois_gdf['category'] == 'healthcare'].copy()
-    
-    if len(healthcare) == 0:
+def create_healthcare_dataset(healthcare):
+    """Create healthcare dataset from the healthcare POI subset"""
+    if healthcare is None or len(healthcare) == 0:
         return None
-    
+
+    healthcare = healthcare.copy()
+
     # Add healthcare-specific fields
-    healthcare['facility_type'] = healthcare.get('amenity', 'unknown')
-    healthcare['emergency'] = healthcare.get('emergency', 'no')
-    healthcare['opening_hours'] = healthcare.get('opening_hours', 'unknown')
-    healthcare['phone'] = healthcare.get('phone', '')
+    healthcare['facility_type'] = (healthcare['amenity'].fillna('unknown')
+                                   if 'amenity' in healthcare.columns else 'unknown')
+    healthcare = apply_field_defaults(healthcare, {
+        'emergency': 'no',
+        'opening_hours': 'unknown',
+        'phone': ''
+    })
     
     logger.info(f"Created healthcare dataset: {len(healthcare)} facilities")
     return healthcare
@@ -64,20 +89,38 @@ def save_business_dataset(gdf, name, output_dir):
         logger.warning(f"No data for {name}")
         return
     
-    # Convert to DataFrame with coordinates
+    # Convert to DataFrame with coordinates (vectorized shapely ufuncs, one C pass)
     df = gdf.copy()
-    df['latitude'] = df.geometry.centroid.y
-    df['longitude'] = df.geometry.centroid.x
+    centroids = shapely.centroid(df.geometry.values)
+    df['latitude'] = shapely.get_y(centroids)
+    df['longitude'] = shapely.get_x(centroids)
+    # Dropping geometry leaves a frame to_csv/to_excel handle natively;
+    # re-wrapping in pd.DataFrame would force a full block copy
     df = df.drop(columns=['geometry'])
-    df = pd.DataFrame(df)
-    
+
     # Save as CSV
     csv_path = Path(output_dir) / f"{name}.csv"
     df.to_csv(csv_path, index=False)
     
-    # Save as Excel
+    # Save as Excel, writing row-major through xlsxwriter so its
+    # constant_memory mode can stream rows to disk. Going through
+    # df.to_excel is not an option here: pandas emits cells
+    # column-by-column, and constant_memory silently discards writes to
+    # rows it has already flushed
     excel_path = Path(output_dir) / f"{name}.xlsx"
-    df.to_excel(excel_path, index=False)
+    try:
+        import xlsxwriter
+        values = df.to_numpy(dtype=object)
+        values[pd.isna(values)] = None  # write_row leaves None cells blank
+        workbook = xlsxwriter.Workbook(str(excel_path),
+                                       {'constant_memory': True})
+        worksheet = workbook.add_worksheet()
+        worksheet.write_row(0, 0, [str(c) for c in df.columns])
+        for i, row in enumerate(values, start=1):
+            worksheet.write_row(i, 0, row)
+        workbook.close()
+    except ImportError:
+        df.to_excel(excel_path, index=False)
     
     logger.info(f"Saved {name}: {len(df)} records -> {csv_path}")
 
@@ -100,30 +143,44 @@ def main():
         return False
     
     logger.info(f"Loading POIs from: {pois_file}")
-    pois_gdf = gpd.read_file(pois_file)
+    # Column-project and bbox-clip the read: only a handful of tag columns
+    # are used downstream, and most OSM tag columns are dead weight here
+    wanted = ['category', 'amenity', 'shop', 'name', 'cuisine', 'opening_hours',
+              'phone', 'website', 'takeaway', 'delivery', 'brand', 'emergency']
+    available = set(pyogrio.read_info(pois_file)['fields'])
+    bbox = config['area'].get('bbox')
+    pois_gdf = pyogrio.read_dataframe(pois_file,
+                                      columns=[c for c in wanted if c in available],
+                                      bbox=tuple(bbox) if bbox else None,
+                                      use_arrow=True)
     logger.info(f"Loaded {len(pois_gdf)} POIs")
     
+    # Split POIs by category in one groupby pass instead of one full-column
+    # equality scan (plus copy) per dataset
+    pois_gdf['category'] = pois_gdf['category'].astype('category')
+    by_category = dict(tuple(pois_gdf.groupby('category', observed=True, sort=False)))
+
     # Create specialized datasets
     datasets = {}
-    
+
     # Restaurants
-    datasets['restaurants'] = create_restaurant_dataset(pois_gdf)
-    
+    datasets['restaurants'] = create_restaurant_dataset(by_category.get('food_beverage'))
+
     # Retail
-    datasets['retail'] = create_retail_dataset(pois_gdf)
-    
+    datasets['retail'] = create_retail_dataset(by_category.get('retail'))
+
     # Healthcare
-    datasets['healthcare'] = create_healthcare_dataset(pois_gdf)
-    
+    datasets['healthcare'] = create_healthcare_dataset(by_category.get('healthcare'))
+
     # Financial services
-    financial = pois_gdf[pois_gdf['category'] == 'financial']
-    if len(financial) > 0:
+    financial = by_category.get('financial')
+    if financial is not None and len(financial) > 0:
         datasets['financial'] = financial
         logger.info(f"Created financial dataset: {len(financial)} services")
-    
+
     # Transport
-    transport = pois_gdf[pois_gdf['category'] == 'transport']
-    if len(transport) > 0:
+    transport = by_category.get('transport')
+    if transport is not None and len(transport) > 0:
         datasets['transport'] = transport
         logger.info(f"Created transport dataset: {len(transport)} facilities")
     
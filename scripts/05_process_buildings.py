@@ -1,12 +1,21 @@
 import sys
 import logging
 import osmnx as ox
+import numpy as np
 import pandas as pd
 import geopandas as gpd
+import pyproj
+import shapely
 from pathlib import Path
 sys.path.append('scripts')
-from utils.osm_helper import (load_config, clean_data, 
-                             save_geospatial_data, save_tabular_data)
+from utils.osm_helper import (load_config, clean_data,
+                             save_geospatial_data, save_tabular_data,
+                             strip_sparse_columns)
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -28,36 +37,87 @@ def extract_buildings(area_name):
         logger.error(f"Error extracting buildings: {e}")
         return None
 
+# Building type mapping, flattened to type -> category for a single map() pass
+BUILDING_CATEGORIES = {
+    'residential': ['house', 'apartments', 'residential', 'detached', 'terrace', 'bungalow'],
+    'commercial': ['commercial', 'office', 'retail', 'shop', 'warehouse'],
+    'institutional': ['school', 'university', 'hospital', 'government', 'public'],
+    'religious': ['church', 'mosque', 'temple', 'cathedral', 'synagogue'],
+    'industrial': ['industrial', 'factory', 'manufacturing'],
+    'recreational': ['sports_hall', 'stadium', 'gym', 'community_centre']
+}
+BUILDING_TYPE_TO_CATEGORY = {building_type: category
+                             for category, types in BUILDING_CATEGORIES.items()
+                             for building_type in types}
+# Generic 'yes' buildings count as residential (common in residential areas)
+BUILDING_TYPE_TO_CATEGORY['yes'] = 'residential'
+
 def categorize_buildings(buildings_gdf):
     """Add categories to buildings based on building type"""
     if buildings_gdf is None or len(buildings_gdf) == 0:
         return buildings_gdf
-    
+
     df = buildings_gdf.copy()
-    df['building_category'] = 'unknown'
-    
-    # Building type mapping
-    building_categories = {
-        'residential': ['house', 'apartments', 'residential', 'detached', 'terrace', 'bungalow'],
-        'commercial': ['commercial', 'office', 'retail', 'shop', 'warehouse'],
-        'institutional': ['school', 'university', 'hospital', 'government', 'public'],
-        'religious': ['church', 'mosque', 'temple', 'cathedral', 'synagogue'],
-        'industrial': ['industrial', 'factory', 'manufacturing'],
-        'recreational': ['sports_hall', 'stadium', 'gym', 'community_centre']
-    }
-    
-    # Categorize based on building type
+
+    # Categorize based on building type: one hash lookup per row instead of
+    # one isin() scan per category, stored as category dtype to shrink memory
+    # for the value_counts below and downstream groupbys.
     if 'building' in df.columns:
-        for category, types in building_categories.items():
-            mask = df['building'].isin(types)
-            df.loc[mask, 'building_category'] = category
-        
-        # Set generic 'yes' buildings as residential (common in residential areas)
-        df.loc[df['building'] == 'yes', 'building_category'] = 'residential'
-    
+        df['building_category'] = (df['building'].map(BUILDING_TYPE_TO_CATEGORY)
+                                   .fillna('unknown')
+                                   .astype('category'))
+    else:
+        df['building_category'] = 'unknown'
+
     logger.info(f"Building categories: {df['building_category'].value_counts().to_dict()}")
     return df
 
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _polygon_areas_kernel(coords, ring_offsets, geom_offsets):
+        """Shoelace area per polygon over the ragged coordinate array"""
+        n = len(geom_offsets) - 1
+        out = np.empty(n)
+        for i in prange(n):
+            total = 0.0
+            for r in range(geom_offsets[i], geom_offsets[i + 1]):
+                start, end = ring_offsets[r], ring_offsets[r + 1]
+                acc = 0.0
+                for j in range(start, end - 1):
+                    acc += (coords[j, 0] * coords[j + 1, 1]
+                            - coords[j + 1, 0] * coords[j, 1])
+                ring_area = abs(acc) * 0.5
+                if r == geom_offsets[i]:
+                    total += ring_area  # exterior ring
+                else:
+                    total -= ring_area  # interior rings are holes
+            out[i] = total
+        return out
+
+def polygon_areas(geoms):
+    """Areas for an array of projected polygons.
+
+    Runs a numba shoelace kernel over the ragged coordinate array when
+    numba is installed, which avoids per-polygon dispatch through the
+    shapely bindings. Falls back to shapely.area when numba is missing
+    or the geometries don't flatten to plain polygon rings.
+    """
+    if njit is None:
+        return shapely.area(geoms)
+
+    try:
+        geom_type, coords, offsets = shapely.to_ragged_array(geoms)
+    except Exception:
+        return shapely.area(geoms)
+
+    if geom_type != shapely.GeometryType.POLYGON:
+        return shapely.area(geoms)
+
+    ring_offsets, geom_offsets = offsets
+    return _polygon_areas_kernel(np.ascontiguousarray(coords, dtype=np.float64),
+                                 np.asarray(ring_offsets, dtype=np.int64),
+                                 np.asarray(geom_offsets, dtype=np.int64))
+
 def add_building_metrics(buildings_gdf):
     """Add useful metrics to buildings"""
     if buildings_gdf is None or len(buildings_gdf) == 0:
@@ -65,30 +125,46 @@ def add_building_metrics(buildings_gdf):
     
     df = buildings_gdf.copy()
     
-    # Calculate area in square meters (convert to local CRS for accuracy)
+    # Calculate area in square meters (project to local CRS for accuracy).
+    # Instead of materializing a full reprojected GeoDataFrame via to_crs,
+    # batch-transform the raw coordinate array in one pyproj call and swap
+    # the coordinates back into a copy of the geometry array.
     logger.info("Calculating building areas...")
-    df_projected = df.to_crs('EPSG:32643')  # UTM Zone 43N for India
-    df['area_sqm'] = df_projected.geometry.area
-    
-    # Add building levels if available
+    transformer = pyproj.Transformer.from_crs(df.crs or 'EPSG:4326', 'EPSG:32643',
+                                              always_xy=True)  # UTM Zone 43N for India
+    geoms = np.array(df.geometry.values, dtype=object)
+    coords = shapely.get_coordinates(geoms)
+    xs, ys = transformer.transform(coords[:, 0], coords[:, 1])
+    projected = shapely.set_coordinates(geoms, np.column_stack([xs, ys]))
+    area_sqm = pd.Series(polygon_areas(projected), index=df.index)
+
+    # Building levels if available
     if 'building:levels' in df.columns:
-        df['levels'] = pd.to_numeric(df['building:levels'], errors='coerce')
+        levels = pd.to_numeric(df['building:levels'], errors='coerce')
     else:
-        df['levels'] = None
-    
-    # Calculate approximate floor area (area * levels)
-    df['estimated_floor_area_sqm'] = df['area_sqm'] * df['levels'].fillna(1)
-    
-    # Add height if available
+        levels = pd.Series(np.nan, index=df.index)
+
+    # Height if available
     if 'height' in df.columns:
-        df['height_meters'] = pd.to_numeric(df['height'].str.replace(' m', ''), errors='coerce')
+        height_meters = pd.to_numeric(df['height'].str.replace(' m', ''), errors='coerce')
     else:
-        df['height_meters'] = None
-    
-    # Add address information if available
+        height_meters = pd.Series(np.nan, index=df.index)
+
+    # Address information if available
     address_fields = ['addr:street', 'addr:housenumber', 'addr:postcode']
-    df['has_address'] = df[address_fields].notna().any(axis=1)
-    
+
+    # Attach all derived columns with a single concat instead of five
+    # separate insertions, each of which re-copies the block manager
+    new_cols = {
+        'area_sqm': area_sqm,
+        'levels': levels,
+        # Approximate floor area (area * levels)
+        'estimated_floor_area_sqm': area_sqm * levels.fillna(1),
+        'height_meters': height_meters,
+        'has_address': df[address_fields].notna().any(axis=1)
+    }
+    df = pd.concat([df, pd.DataFrame(new_cols, index=df.index)], axis=1, copy=False)
+
     return df
 
 def create_building_summary(buildings_gdf):
@@ -133,7 +209,13 @@ def main():
     
     # Add building metrics
     buildings = add_building_metrics(buildings)
-    
+
+    # Drop mostly-empty tag columns to cut downstream IO
+    buildings = strip_sparse_columns(buildings, keep=[
+        'name', 'building', 'building_category', 'area_sqm', 'levels',
+        'estimated_floor_area_sqm', 'height_meters', 'has_address',
+        'addr:street', 'addr:housenumber', 'addr:postcode'])
+
     # Clean data
     buildings = clean_data(buildings)
     
@@ -1,27 +1,54 @@
 import sys
+import gzip
 import logging
+import numpy as np
 import pandas as pd
 import geopandas as gpd
 import folium
+from folium.plugins import FastMarkerCluster
+import pyogrio
+import shapely
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import matplotlib.pyplot as plt
 import seaborn as sns
+from matplotlib.colors import to_hex
+from matplotlib.lines import Line2D
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def create_interactive_map():
+def read_processed_layer(name, columns=None):
+    """Read a processed layer, preferring the GeoParquet copy when present
+
+    columns limits the read to the attributes the visualizations actually
+    use; geometry is always included.
+    """
+    parquet_path = Path(f'data/processed/{name}.parquet')
+    if parquet_path.exists():
+        if columns is not None:
+            try:
+                return gpd.read_parquet(parquet_path, columns=columns + ['geometry'])
+            except Exception:
+                pass  # fall back to a full read if a column is missing
+        return gpd.read_parquet(parquet_path)
+
+    geojson_path = f'data/processed/{name}.geojson'
+    if columns is not None:
+        available = set(pyogrio.read_info(geojson_path)['fields'])
+        columns = [c for c in columns if c in available]
+    return gpd.read_file(geojson_path, engine='pyogrio', use_arrow=True,
+                         columns=columns)
+
+def create_interactive_map(pois, buildings):
     """Create an interactive Folium map with all data layers"""
     logger.info("Creating interactive map...")
-    
-    # Load data
-    pois = gpd.read_file('data/processed/koramangala_pois.geojson')
-    roads = gpd.read_file('data/processed/koramangala_roads.geojson')
-    buildings = gpd.read_file('data/processed/koramangala_buildings.geojson')
-    
-    # Get center point
-    center_lat = pois.geometry.centroid.y.mean()
-    center_lon = pois.geometry.centroid.x.mean()
+
+    # Get center point from the bounds midpoint: one min/max sweep,
+    # no per-geometry GEOS centroid call
+    minx, miny, maxx, maxy = pois.total_bounds
+    center_lon = (minx + maxx) / 2
+    center_lat = (miny + maxy) / 2
     
     # Create base map
     m = folium.Map(
@@ -30,72 +57,90 @@ def create_interactive_map():
         tiles='OpenStreetMap'
     )
     
-    # Add buildings layer (as background)
+    # Add buildings layer (as background, one GeoJson layer instead of per-row polygons)
     logger.info("Adding buildings layer...")
-    buildings_sample = buildings.sample(min(1000, len(buildings)))  # Sample for performance
-    for idx, building in buildings_sample.iterrows():
-        if building.geometry.geom_type == 'Polygon':
-            # Convert to GeoJSON-like format
-            coords = [[list(coord) for coord in building.geometry.exterior.coords]]
-            folium.Polygon(
-                locations=[[coord[1], coord[0]] for coord in coords[0]],
-                color='gray',
-                weight=1,
-                fillColor='lightgray',
-                fillOpacity=0.3,
-                popup=f"Building: {building.get('building', 'Unknown')}<br>Area: {building.get('area_sqm', 0):.0f} sqm"
-            ).add_to(m)
-    
+    # Keep only buildings in the initial viewport via the spatial index, then
+    # sample; uniform sampling wastes polygons outside the opening view
+    map_bbox = shapely.box(center_lon - 0.01, center_lat - 0.01,
+                           center_lon + 0.01, center_lat + 0.01)
+    candidate_idx = buildings.sindex.query(map_bbox, predicate='intersects')
+    buildings_sample = buildings.iloc[candidate_idx]
+    if len(buildings_sample) > 1000:
+        buildings_sample = buildings_sample.sample(1000)  # Sample for performance
+    buildings_sample = buildings_sample.copy()
+    # Simplify outlines to cut vertex count before GeoJSON serialization
+    buildings_sample['geometry'] = buildings_sample.geometry.simplify(1e-5, preserve_topology=False)
+    for col in ('building', 'area_sqm'):
+        if col not in buildings_sample.columns:
+            buildings_sample[col] = 'Unknown' if col == 'building' else 0
+    folium.GeoJson(
+        buildings_sample[['geometry', 'building', 'area_sqm']],
+        name='Buildings',
+        style_function=lambda feature: {
+            'color': 'gray',
+            'weight': 1,
+            'fillColor': 'lightgray',
+            'fillOpacity': 0.3
+        },
+        tooltip=folium.GeoJsonTooltip(fields=['building', 'area_sqm'],
+                                      aliases=['Building:', 'Area (sqm):'])
+    ).add_to(m)
+
     # Color mapping for POI categories
     category_colors = {
         'food_beverage': 'red',
-        'retail': 'blue', 
+        'retail': 'blue',
         'healthcare': 'green',
         'financial': 'purple',
         'transport': 'orange',
         'education': 'darkblue',
         'other': 'gray'
     }
-    
-    # Add POIs layer (handle mixed geometry types)
+
+    # Add POIs as clustered markers: the HTML only carries the coordinate
+    # list, clustering and marker construction happen client-side
     logger.info("Adding POIs layer...")
-    for idx, poi in pois.iterrows():
-        category = poi.get('category', 'other')
+    poi_points = pois.copy()
+    # representative_point handles mixed geometry types like centroid does
+    # but is much cheaper in GEOS, and marker placement only needs a point
+    # inside the feature
+    poi_points['geometry'] = poi_points.geometry.representative_point()
+    if 'category' not in poi_points.columns:
+        poi_points['category'] = 'other'
+    poi_points['category'] = poi_points['category'].fillna('other')
+
+    # One cluster per category so the color can be baked into the JS callback
+    for category, group in poi_points.groupby('category', observed=True):
         color = category_colors.get(category, 'gray')
-        
-        # Get coordinates (handle both points and polygons)
-        if poi.geometry.geom_type == 'Point':
-            lat, lon = poi.geometry.y, poi.geometry.x
-        else:
-            # Use centroid for polygons
-            centroid = poi.geometry.centroid
-            lat, lon = centroid.y, centroid.x
-        
-        folium.CircleMarker(
-            location=[lat, lon],
-            radius=6,
-            popup=f"<b>{poi.get('name', 'Unknown')}</b><br>"
-                  f"Category: {category}<br>"
-                  f"Type: {poi.get('amenity', poi.get('shop', 'Unknown'))}",
-            color=color,
-            fillColor=color,
-            fillOpacity=0.7
-        ).add_to(m)
+        callback = (
+            "function (row) {"
+            f"return L.circleMarker([row[0], row[1]], "
+            f"{{radius: 6, color: '{color}', fillColor: '{color}', fillOpacity: 0.7}});"
+            "}"
+        )
+        locations = np.column_stack([group.geometry.y.to_numpy(),
+                                     group.geometry.x.to_numpy()]).tolist()
+        FastMarkerCluster(locations, callback=callback,
+                          name=f'POIs: {category}').add_to(m)
     
     # Add layer control
     folium.LayerControl().add_to(m)
     
-    # Save map
+    # Save map: render the document tree once and write the HTML directly
+    # instead of re-rendering through m.save; keep a gzipped copy alongside
+    # since the payload is mostly repeated JS boilerplate
     map_path = 'data/outputs/koramangala_interactive_map.html'
-    m.save(map_path)
+    html = m.get_root().render()
+    Path(map_path).write_text(html, encoding='utf-8')
+    Path(map_path + '.gz').write_bytes(gzip.compress(html.encode('utf-8')))
     logger.info(f"Interactive map saved: {map_path}")
     
     return map_path
 
-def create_business_charts():
+def create_business_charts(pois, buildings):
     """Create business analysis charts"""
     logger.info("Creating business analysis charts...")
-    
+
     # Load business data
     restaurants = pd.read_csv('data/outputs/koramangala_restaurants.csv')
     retail = pd.read_csv('data/outputs/koramangala_retail.csv')
@@ -106,7 +151,6 @@ def create_business_charts():
     fig.suptitle('Koramangala Business Analysis', fontsize=16, fontweight='bold')
     
     # 1. POI Categories Distribution
-    pois = gpd.read_file('data/processed/koramangala_pois.geojson')
     category_counts = pois['category'].value_counts()
     
     axes[0,0].pie(category_counts.values, labels=category_counts.index, autopct='%1.1f%%')
@@ -131,7 +175,6 @@ def create_business_charts():
         axes[1,0].set_xlabel('Count')
     
     # 4. Building Categories
-    buildings = gpd.read_file('data/processed/koramangala_buildings.geojson')
     building_cats = buildings['building_category'].value_counts()
     
     axes[1,1].bar(range(len(building_cats)), building_cats.values)
@@ -149,32 +192,53 @@ def create_business_charts():
     
     return chart_path
 
-def create_spatial_distribution_map():
+def create_spatial_distribution_map(pois, buildings):
     """Create a heatmap-style visualization of business density"""
     logger.info("Creating spatial distribution visualization...")
-    
-    # Load POI data
-    pois = gpd.read_file('data/processed/koramangala_pois.geojson')
-    
+
     # Create figure
     fig, ax = plt.subplots(figsize=(12, 10))
-    
+
     # Plot buildings as background
-    buildings = gpd.read_file('data/processed/koramangala_buildings.geojson')
     buildings.plot(ax=ax, color='lightgray', alpha=0.5, edgecolor='gray', linewidth=0.5)
     
-    # Plot POIs by category with different colors
+    # Limit POIs to the plotted building extent with one R-tree query
+    # instead of per-category boolean scans over the whole frame
+    visible_idx = pois.sindex.query(shapely.box(*buildings.total_bounds))
+    pois = pois.iloc[np.sort(visible_idx)]
+
+    # Plot all POIs in one aggregation pass instead of one plot() per category
     categories = pois['category'].unique()
     colors = plt.cm.Set3(range(len(categories)))
-    
-    for i, category in enumerate(categories):
-        category_pois = pois[pois['category'] == category]
-        if len(category_pois) > 0:
-            category_pois.plot(ax=ax, color=colors[i], markersize=30, 
-                             alpha=0.7, label=f"{category} ({len(category_pois)})")
-    
+    color_key = {category: to_hex(colors[i]) for i, category in enumerate(categories)}
+    category_counts = pois['category'].value_counts()
+
+    centroids = pois.geometry.centroid  # centroid of a Point is the Point itself
+    xs = centroids.x.to_numpy()
+    ys = centroids.y.to_numpy()
+
+    try:
+        # Datashader rasterizes the whole categorical point set in one pass
+        import datashader as ds
+        import datashader.transfer_functions as tf
+
+        cvs = ds.Canvas(plot_width=1200, plot_height=1000)
+        point_df = pd.DataFrame({'x': xs, 'y': ys,
+                                 'cat': pd.Categorical(pois['category'])})
+        agg = cvs.points(point_df, 'x', 'y', ds.count_cat('cat'))
+        img = tf.shade(agg, color_key=color_key)
+        ax.imshow(img.to_pil(), extent=[xs.min(), xs.max(), ys.min(), ys.max()],
+                  zorder=2)
+    except ImportError:
+        # Fallback: a single scatter call with a vectorized color array
+        point_colors = pois['category'].map(color_key).fillna('#999999')
+        ax.scatter(xs, ys, c=point_colors, s=30, alpha=0.7, zorder=2)
+
     ax.set_title('Koramangala: Spatial Distribution of Businesses', fontsize=14, fontweight='bold')
-    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    legend_handles = [Line2D([0], [0], marker='o', linestyle='', color=color_key[category],
+                             label=f"{category} ({category_counts.get(category, 0)})")
+                      for category in categories]
+    ax.legend(handles=legend_handles, bbox_to_anchor=(1.05, 1), loc='upper left')
     ax.set_axis_off()
     
     plt.tight_layout()
@@ -186,27 +250,25 @@ def create_spatial_distribution_map():
     
     return spatial_path
 
-def create_summary_dashboard():
+def create_summary_dashboard(pois, buildings, roads):
     """Create a summary dashboard with key metrics"""
     logger.info("Creating summary dashboard...")
-    
-    # Load all data
-    pois = gpd.read_file('data/processed/koramangala_pois.geojson')
-    buildings = gpd.read_file('data/processed/koramangala_buildings.geojson')
-    roads = gpd.read_file('data/processed/koramangala_roads.geojson')
-    
-    # Calculate metrics
+
+    # Calculate metrics from one value_counts per frame instead of one
+    # boolean filter per metric
+    poi_counts = pois['category'].value_counts()
+    building_counts = buildings['building_category'].value_counts()
     metrics = {
         'total_pois': len(pois),
         'total_buildings': len(buildings),
         'total_roads': len(roads),
-        'restaurants': len(pois[pois['category'] == 'food_beverage']),
-        'retail_outlets': len(pois[pois['category'] == 'retail']),
-        'healthcare_facilities': len(pois[pois['category'] == 'healthcare']),
+        'restaurants': int(poi_counts.get('food_beverage', 0)),
+        'retail_outlets': int(poi_counts.get('retail', 0)),
+        'healthcare_facilities': int(poi_counts.get('healthcare', 0)),
         'total_building_area_sqm': buildings['area_sqm'].sum(),
         'avg_building_size_sqm': buildings['area_sqm'].mean(),
-        'commercial_buildings': len(buildings[buildings['building_category'] == 'commercial']),
-        'residential_buildings': len(buildings[buildings['building_category'] == 'residential'])
+        'commercial_buildings': int(building_counts.get('commercial', 0)),
+        'residential_buildings': int(building_counts.get('residential', 0))
     }
     
     # Create dashboard
@@ -268,19 +330,42 @@ def main():
             logger.error("Please run the processing scripts first")
             return False
     
-    # Create visualizations
+    # Load each layer once and share it across all visualizations
+    # (GeoJSON parsing dominates this script, so avoid re-reading per function)
+    logger.info("Loading processed layers...")
+    data = {
+        'pois': read_processed_layer('koramangala_pois',
+                                     columns=['name', 'category', 'amenity', 'shop']),
+        'buildings': read_processed_layer('koramangala_buildings',
+                                          columns=['building', 'building_category',
+                                                   'area_sqm']),
+        'roads': read_processed_layer('koramangala_roads', columns=['highway'])
+    }
+    # category dtype makes the repeated value_counts/breakdowns below
+    # integer histograms instead of string hashing
+    if 'category' in data['pois'].columns:
+        data['pois']['category'] = data['pois']['category'].astype('category')
+    if 'building_category' in data['buildings'].columns:
+        data['buildings']['building_category'] = \
+            data['buildings']['building_category'].astype('category')
+
+    # Create visualizations; the four renders are independent, so run them
+    # in worker processes instead of back-to-back
     try:
-        # Interactive map
-        map_path = create_interactive_map()
-        
-        # Business charts
-        chart_path = create_business_charts()
-        
-        # Spatial distribution
-        spatial_path = create_spatial_distribution_map()
-        
-        # Summary dashboard
-        dashboard_path, metrics = create_summary_dashboard()
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            map_future = executor.submit(create_interactive_map,
+                                         data['pois'], data['buildings'])
+            chart_future = executor.submit(create_business_charts,
+                                           data['pois'], data['buildings'])
+            spatial_future = executor.submit(create_spatial_distribution_map,
+                                             data['pois'], data['buildings'])
+            dashboard_future = executor.submit(create_summary_dashboard,
+                                               data['pois'], data['buildings'], data['roads'])
+
+            map_path = map_future.result()
+            chart_path = chart_future.result()
+            spatial_path = spatial_future.result()
+            dashboard_path, metrics = dashboard_future.result()
         
         # Summary
         logger.info("Visualization Creation Complete!")
@@ -1,12 +1,14 @@
 import requests
 import rasterio
-from rasterio.mask import mask
+from rasterio.windows import from_bounds
 import geopandas as gpd
 import pandas as pd
 import numpy as np
+import shapely
+from shapely.strtree import STRtree
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import logging
-from shapely.geometry import box
 import matplotlib.pyplot as plt
 import zipfile
 import os
@@ -15,21 +17,102 @@ from urllib.parse import urljoin
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# numba is optional; it only accelerates the mixed-radius buffer path
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# aiohttp is optional; without it full-file downloads fall back to a
+# single requests stream
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _buffer_sums_kernel(data, rows, cols, radii, out):
+        for i in prange(rows.size):
+            r0 = max(0, rows[i] - radii[i])
+            r1 = min(data.shape[0], rows[i] + radii[i] + 1)
+            c0 = max(0, cols[i] - radii[i])
+            c1 = min(data.shape[1], cols[i] + radii[i] + 1)
+            s = 0.0
+            for r in range(r0, r1):
+                for c in range(c0, c1):
+                    s += data[r, c]
+            out[i] = s
+
+def poi_buffer_sums(data, rows, cols, radii):
+    """Sum the pixels in a window around each POI
+
+    Uniform radii go through a summed-area table, making each lookup O(1).
+    Mixed radii (e.g. category-dependent catchments) use the JIT-compiled
+    kernel when numba is installed, with plain slicing as the fallback.
+    """
+    radii = np.asarray(radii, dtype=np.int64)
+    uniform = radii.size == 0 or radii.min() == radii.max()
+
+    if uniform:
+        b = int(radii[0]) if radii.size else 1
+        # Accumulate in float64: the running sums span the whole raster,
+        # where float32 would lose precision
+        sat = (np.pad(data, ((1, 0), (1, 0)))
+               .cumsum(axis=0, dtype=np.float64)
+               .cumsum(axis=1, dtype=np.float64))
+        r_min = np.clip(rows - b, 0, data.shape[0])
+        r_max = np.clip(rows + b + 1, 0, data.shape[0])
+        c_min = np.clip(cols - b, 0, data.shape[1])
+        c_max = np.clip(cols + b + 1, 0, data.shape[1])
+        return (sat[r_max, c_max] - sat[r_min, c_max]
+                - sat[r_max, c_min] + sat[r_min, c_min])
+
+    if njit is not None:
+        out = np.empty(rows.size, dtype=np.float64)
+        _buffer_sums_kernel(data, rows.astype(np.int64),
+                            cols.astype(np.int64), radii, out)
+        return out
+
+    out = np.empty(rows.size, dtype=np.float64)
+    for i in range(rows.size):
+        r0 = max(0, rows[i] - radii[i])
+        r1 = min(data.shape[0], rows[i] + radii[i] + 1)
+        c0 = max(0, cols[i] - radii[i])
+        c1 = min(data.shape[1], cols[i] + radii[i] + 1)
+        out[i] = data[r0:r1, c0:c1].sum()
+    return out
+
 class RealWorldPopProcessor:
     def __init__(self):
         # Updated URLs for WorldPop data
         self.base_url = "https://data.worldpop.org/GIS/"
         self.data_dir = Path("data/worldpop_real")
         self.data_dir.mkdir(exist_ok=True)
-        
+        # POIs and their spatial index, populated on first load
+        self.pois = None
+        self.poi_tree = None
+
+    def load_pois(self):
+        """Load POIs once and build an STRtree over their geometries
+
+        The R-tree makes every later bounds/buffer query sub-linear instead
+        of scanning the full POI set.
+        """
+        if self.pois is None:
+            pois_file = 'data/processed/koramangala_pois.geojson'
+            if not Path(pois_file).exists():
+                logger.error(f"POI file not found: {pois_file}")
+                return None
+            self.pois = gpd.read_file(pois_file)
+            self.poi_tree = STRtree(self.pois.geometry.values)
+        return self.pois
+
     def get_koramangala_bounds(self):
         """Get bounding box for Koramangala from POI data"""
-        pois_file = 'data/processed/koramangala_pois.geojson'
-        if not Path(pois_file).exists():
-            logger.error(f"POI file not found: {pois_file}")
+        pois = self.load_pois()
+        if pois is None:
             return None
-        
-        pois = gpd.read_file(pois_file)
         bounds = pois.total_bounds
         
         # Add small buffer around the bounds
@@ -40,9 +123,84 @@ class RealWorldPopProcessor:
         logger.info(f"Koramangala bounds: {bounds}")
         return bounds
     
-    def download_real_worldpop_data(self, year=2020):
-        """Download actual WorldPop population data for India"""
-        
+    def _fetch_aoi_window(self, url, bounds, output_file):
+        """Read just the AOI window from a remote GeoTIFF via /vsicurl/
+
+        WorldPop rasters are tiled, so GDAL fetches only the overlapping
+        internal tiles with HTTP range requests instead of the whole
+        country-scale file.
+        """
+        env = rasterio.Env(GDAL_DISABLE_READDIR_ON_OPEN='EMPTY_DIR',
+                           CPL_VSIL_CURL_ALLOWED_EXTENSIONS='.tif',
+                           VSI_CACHE='YES',
+                           GDAL_HTTP_MULTIRANGE='YES',
+                           GDAL_HTTP_MERGE_CONSECUTIVE_RANGES='YES')
+        with env, rasterio.open('/vsicurl/' + url) as src:
+            window = from_bounds(bounds[0], bounds[1], bounds[2], bounds[3],
+                                 transform=src.transform)
+            data = src.read(window=window)
+            meta = src.meta.copy()
+            meta.update({
+                'driver': 'GTiff',
+                'height': data.shape[1],
+                'width': data.shape[2],
+                'transform': src.window_transform(window)
+            })
+
+        with rasterio.open(output_file, 'w', **meta) as dest:
+            dest.write(data)
+        logger.info(f"Fetched AOI window: {output_file} "
+                    f"({data.shape[2]}x{data.shape[1]} pixels)")
+
+    def _download_parallel_ranges(self, url, output_file, total_size,
+                                  n_chunks=8):
+        """Download a file as concurrent HTTP range requests
+
+        Splits the file into byte ranges fetched in parallel and written
+        with pwrite into preallocated space, so a single TCP stream does
+        not cap throughput on large GeoTIFFs.
+        """
+        import asyncio
+
+        chunk = (total_size + n_chunks - 1) // n_chunks
+        ranges = [(start, min(start + chunk, total_size) - 1)
+                  for start in range(0, total_size, chunk)]
+
+        fd = os.open(output_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        try:
+            try:
+                os.posix_fallocate(fd, 0, total_size)
+            except (AttributeError, OSError):
+                pass
+
+            async def _fetch_range(session, sem, start, end):
+                async with sem:
+                    headers = {'Range': f'bytes={start}-{end}'}
+                    async with session.get(url, headers=headers) as resp:
+                        resp.raise_for_status()
+                        offset = start
+                        async for part in resp.content.iter_chunked(1 << 20):
+                            os.pwrite(fd, part, offset)
+                            offset += len(part)
+
+            async def _run():
+                sem = asyncio.Semaphore(8)
+                timeout = aiohttp.ClientTimeout(total=600)
+                async with aiohttp.ClientSession(timeout=timeout) as session:
+                    await asyncio.gather(*[_fetch_range(session, sem, s, e)
+                                           for s, e in ranges])
+
+            asyncio.run(_run())
+        finally:
+            os.close(fd)
+
+    def download_real_worldpop_data(self, year=2020, bounds=None):
+        """Download actual WorldPop population data for India
+
+        When bounds are given, only that window is streamed from the remote
+        GeoTIFF; the full-file download remains as a fallback.
+        """
+
         # Real WorldPop dataset URLs for India (updated for 2020)
         datasets = {
             'total_population': {
@@ -55,70 +213,111 @@ class RealWorldPopProcessor:
             }
         }
         
-        downloaded_files = {}
-        
-        for dataset_name, dataset_info in datasets.items():
+        def _fetch_one(dataset_name, dataset_info):
+            """Fetch a single dataset; returns its local path or None"""
+            # Preferred path: stream just the Koramangala window via GDAL's
+            # /vsicurl/ range reads — network bytes drop from hundreds of MB
+            # to the handful of tiles overlapping the AOI
+            if bounds is not None:
+                aoi_file = self.data_dir / f"{dataset_name}_{year}_aoi.tif"
+                if aoi_file.exists():
+                    logger.info(f"AOI window already fetched: {aoi_file}")
+                    return aoi_file
+                try:
+                    self._fetch_aoi_window(dataset_info['url'], bounds, aoi_file)
+                    return aoi_file
+                except Exception as e:
+                    logger.warning(f"Remote windowed read failed for {dataset_name}: {e}")
+                    logger.warning("Falling back to full download")
+
             output_file = self.data_dir / f"{dataset_name}_{year}.tif"
-            
+
             if output_file.exists():
                 # Check if file is reasonable size (>10MB for real data)
                 file_size = output_file.stat().st_size / (1024*1024)  # MB
                 if file_size > 10:
                     logger.info(f"Real data file already exists: {output_file} ({file_size:.1f}MB)")
-                    downloaded_files[dataset_name] = output_file
-                    continue
+                    return output_file
                 else:
                     logger.warning(f"Existing file too small ({file_size:.1f}MB), re-downloading")
                     output_file.unlink()
-            
+
             url = dataset_info['url']
             logger.info(f"Downloading {dataset_info['description']} from WorldPop...")
             logger.info(f"URL: {url}")
-            
+
             try:
                 # Check if URL exists
                 response = requests.head(url, timeout=30)
                 if response.status_code != 200:
                     logger.error(f"URL not accessible: {response.status_code}")
-                    continue
-                
-                # Download with progress indication
-                response = requests.get(url, stream=True, timeout=300)
-                response.raise_for_status()
-                
+                    return None
+
                 total_size = int(response.headers.get('content-length', 0))
-                logger.info(f"Downloading {total_size/(1024*1024):.1f}MB...")
-                
-                downloaded = 0
-                with open(output_file, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            if total_size > 0:
-                                progress = (downloaded / total_size) * 100
-                                if downloaded % (1024*1024*10) == 0:  # Log every 10MB
-                                    logger.info(f"Progress: {progress:.1f}%")
-                
+                accepts_ranges = response.headers.get('Accept-Ranges', '') == 'bytes'
+
+                # Preferred path: concurrent range requests saturate the
+                # link instead of one TCP stream
+                downloaded_ok = False
+                if aiohttp is not None and total_size > 0 and accepts_ranges:
+                    logger.info(f"Downloading {total_size/(1024*1024):.1f}MB "
+                                f"with parallel range requests...")
+                    try:
+                        self._download_parallel_ranges(url, output_file, total_size)
+                        downloaded_ok = True
+                    except Exception as e:
+                        logger.warning(f"Parallel range download failed: {e}")
+                        logger.warning("Falling back to single-stream download")
+
+                if not downloaded_ok:
+                    # Download with progress indication
+                    response = requests.get(url, stream=True, timeout=300)
+                    response.raise_for_status()
+
+                    logger.info(f"Downloading {total_size/(1024*1024):.1f}MB...")
+
+                    downloaded = 0
+                    with open(output_file, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=8192):
+                            if chunk:
+                                f.write(chunk)
+                                downloaded += len(chunk)
+                                if total_size > 0:
+                                    progress = (downloaded / total_size) * 100
+                                    if downloaded % (1024*1024*10) == 0:  # Log every 10MB
+                                        logger.info(f"Progress: {progress:.1f}%")
+
                 file_size = output_file.stat().st_size / (1024*1024)  # MB
                 logger.info(f"Downloaded: {output_file} ({file_size:.1f}MB)")
-                
+
                 # Verify this is actually a GeoTIFF
                 try:
                     with rasterio.open(output_file) as src:
                         logger.info(f"Verified GeoTIFF: {src.shape} pixels, CRS: {src.crs}")
-                    downloaded_files[dataset_name] = output_file
+                    return output_file
                 except Exception as e:
                     logger.error(f"Downloaded file is not a valid GeoTIFF: {e}")
                     output_file.unlink()
-                
+                    return None
+
             except requests.exceptions.RequestException as e:
                 logger.error(f"Failed to download {dataset_name}: {e}")
-                continue
+                return None
             except Exception as e:
                 logger.error(f"Unexpected error downloading {dataset_name}: {e}")
-                continue
-        
+                return None
+
+        # The datasets are independent and the work is network/disk bound,
+        # so fetch them concurrently
+        downloaded_files = {}
+        with ThreadPoolExecutor(max_workers=len(datasets)) as executor:
+            futures = {name: executor.submit(_fetch_one, name, info)
+                       for name, info in datasets.items()}
+            for name, future in futures.items():
+                path = future.result()
+                if path is not None:
+                    downloaded_files[name] = path
+
         if not downloaded_files:
             logger.error("No WorldPop data could be downloaded. Check internet connection and URLs.")
             return None
@@ -159,140 +358,184 @@ class RealWorldPopProcessor:
         if not raster_files:
             logger.error("No raster files to process")
             return None
-        
-        # Create bounding box geometry
-        bbox_geom = [box(*bounds)]
-        
-        clipped_data = {}
-        
-        for dataset_name, file_path in raster_files.items():
+
+        def _clip_one(dataset_name, file_path):
+            """Clip a single dataset; returns its clip record or None"""
             logger.info(f"Clipping {dataset_name} to Koramangala...")
-            
+
             try:
+                # Each worker opens its own dataset handle; rasterio handles
+                # are not safe to share across threads
                 with rasterio.open(file_path) as src:
                     logger.info(f"Original raster info: {src.shape} pixels, bounds: {src.bounds}")
-                    
-                    # Check if our bounds intersect with the raster
-                    if not src.bounds.left <= bounds[2] and src.bounds.bottom <= bounds[3] and \
-                           src.bounds.right >= bounds[0] and src.bounds.top >= bounds[1]:
+
+                    # Check if our bounds intersect with the raster. The old
+                    # chained comparison bound `not` to its first clause only,
+                    # so non-overlapping rasters slipped through to a full
+                    # windowed read that came back empty.
+                    src_box = shapely.box(*src.bounds)
+                    if not src_box.intersects(shapely.box(*bounds)):
                         logger.error(f"Bounds do not intersect with raster: {src.bounds} vs {bounds}")
-                        continue
-                    
-                    # Clip raster to bounds
-                    clipped_img, clipped_transform = mask(src, bbox_geom, crop=True, filled=False)
-                    
+                        return None
+
+                    # Clip raster to bounds with a windowed read: only the
+                    # AOI window is decoded instead of the full country raster
+                    window = from_bounds(bounds[0], bounds[1], bounds[2], bounds[3],
+                                         transform=src.transform)
+                    clipped_img = src.read(window=window, masked=True,
+                                           out_dtype='float32')
+                    clipped_transform = src.window_transform(window)
+
                     if clipped_img.size == 0:
                         logger.error(f"Clipping resulted in empty array for {dataset_name}")
-                        continue
-                    
+                        return None
+
                     clipped_meta = src.meta.copy()
-                    
-                    # Update metadata
+
+                    # Update metadata; tiling plus compression means later
+                    # windowed reads decode only the overlapping 256x256
+                    # tiles instead of full strips
                     clipped_meta.update({
                         "driver": "GTiff",
                         "height": clipped_img.shape[1],
-                        "width": clipped_img.shape[2], 
-                        "transform": clipped_transform
+                        "width": clipped_img.shape[2],
+                        "transform": clipped_transform,
+                        "tiled": True,
+                        "blockxsize": 256,
+                        "blockysize": 256,
+                        "compress": "DEFLATE",
+                        "predictor": 2
                     })
-                    
+
                     # Save clipped raster
                     clipped_file = self.data_dir / f"koramangala_{dataset_name}_real.tif"
-                    with rasterio.open(clipped_file, "w", **clipped_meta) as dest:
+                    with rasterio.open(clipped_file, "w",
+                                       BIGTIFF='IF_SAFER', **clipped_meta) as dest:
                         dest.write(clipped_img)
-                    
-                    clipped_data[dataset_name] = {
+
+                    # Also persist a chunked Zarr store so later scripts can
+                    # open metadata lazily and read chunk-aligned blocks
+                    # instead of re-scanning the GeoTIFF
+                    try:
+                        import zarr
+                        z = zarr.open(str(self.data_dir / f'{dataset_name}.zarr'),
+                                      mode='w', shape=clipped_img.shape[-2:],
+                                      chunks=(256, 256), dtype='float32')
+                        z[:] = np.ma.filled(clipped_img[0].astype('float32'), 0.0)
+                        z.attrs['transform'] = list(clipped_transform)[:6]
+                        z.attrs['bounds'] = list(bounds)
+                    except ImportError:
+                        pass
+                    except Exception as e:
+                        logger.warning(f"Could not write Zarr store for {dataset_name}: {e}")
+
+                    # Fill nodata/NaN with zero once here; NaN is never a
+                    # legitimate population, so every downstream reduction
+                    # can run on the raw array without mask temporaries.
+                    # float32 halves the memory traffic of those reductions;
+                    # accumulations below widen to float64 explicitly.
+                    band = np.nan_to_num(np.ma.filled(clipped_img[0], 0.0),
+                                         copy=False)
+
+                    record = {
                         'file': clipped_file,
-                        'data': clipped_img[0],  # Remove band dimension
+                        'data': band,  # Band dimension removed, NaN-free
                         'transform': clipped_transform,
                         'bounds': bounds,
                         'original_bounds': src.bounds,
                         'resolution': src.res
                     }
-                    
-                    # Log statistics
-                    non_zero_cells = np.count_nonzero(clipped_img[0])
-                    total_pop = np.sum(clipped_img[0][~np.isnan(clipped_img[0])])
-                    
+
+                    non_zero_cells = np.count_nonzero(band)
+                    total_pop = band.sum()
+
                     logger.info(f"Clipped {dataset_name}: {clipped_img.shape}")
                     logger.info(f"  Non-zero cells: {non_zero_cells}")
                     logger.info(f"  Total population: {total_pop:.0f}")
                     logger.info(f"  Resolution: {src.res[0]:.6f} degrees")
-                    
+                    return record
+
             except Exception as e:
                 logger.error(f"Error clipping {dataset_name}: {e}")
-                continue
-        
+                return None
+
+        # Clip the datasets concurrently; the work is IO-bound and rasterio
+        # releases the GIL during reads
+        clipped_data = {}
+        with ThreadPoolExecutor(max_workers=len(raster_files)) as executor:
+            futures = {name: executor.submit(_clip_one, name, path)
+                       for name, path in raster_files.items()}
+            for name, future in futures.items():
+                record = future.result()
+                if record is not None:
+                    clipped_data[name] = record
+
         return clipped_data
     
     def create_poi_population_analysis(self, clipped_data):
         """Extract real population data around each POI location"""
-        
+
         if not clipped_data:
             logger.error("No clipped population data available")
             return None
-        
-        # Load POI data
-        pois = gpd.read_file('data/processed/koramangala_pois.geojson')
-        
-        poi_population_data = []
-        
-        for idx, poi in pois.iterrows():
-            # Get POI coordinates
-            if poi.geometry.geom_type == 'Point':
-                poi_x, poi_y = poi.geometry.x, poi.geometry.y
-            else:
-                centroid = poi.geometry.centroid
-                poi_x, poi_y = centroid.x, centroid.y
-            
-            poi_data = {
-                'poi_id': idx,
-                'poi_name': poi.get('name', 'Unknown'),
-                'poi_category': poi.get('category', 'Unknown'),
-                'latitude': poi_y,
-                'longitude': poi_x
-            }
-            
-            # Extract population data from each raster
-            for dataset_name, data_info in clipped_data.items():
-                try:
-                    transform = data_info['transform']
-                    col, row = ~transform * (poi_x, poi_y)
-                    col, row = int(col), int(row)
-                    
-                    data = data_info['data']
-                    
-                    # Get population value at POI location
-                    if 0 <= row < data.shape[0] and 0 <= col < data.shape[1]:
-                        pop_value = data[row, col]
-                        if np.isnan(pop_value):
-                            pop_value = 0
-                        poi_data[f'{dataset_name}_at_location'] = float(pop_value)
-                        
-                        # Calculate population in buffer area
-                        # Buffer size depends on resolution
-                        resolution = data_info['resolution'][0]  # degrees
-                        buffer_cells = max(1, int(0.002 / resolution))  # ~200m buffer
-                        
-                        r_min = max(0, row - buffer_cells)
-                        r_max = min(data.shape[0], row + buffer_cells + 1)
-                        c_min = max(0, col - buffer_cells)
-                        c_max = min(data.shape[1], col + buffer_cells + 1)
-                        
-                        buffer_data = data[r_min:r_max, c_min:c_max]
-                        buffer_sum = np.sum(buffer_data[~np.isnan(buffer_data)])
-                        poi_data[f'{dataset_name}_in_buffer'] = float(buffer_sum)
-                    else:
-                        poi_data[f'{dataset_name}_at_location'] = 0.0
-                        poi_data[f'{dataset_name}_in_buffer'] = 0.0
-                        
-                except Exception as e:
-                    logger.warning(f"Error extracting {dataset_name} for POI {idx}: {e}")
-                    poi_data[f'{dataset_name}_at_location'] = 0.0
-                    poi_data[f'{dataset_name}_in_buffer'] = 0.0
-            
-            poi_population_data.append(poi_data)
-        
-        return pd.DataFrame(poi_population_data)
+
+        # Load POI data (cached with its spatial index)
+        pois = self.load_pois()
+        if pois is None:
+            return None
+
+        # Shortlist POIs inside the analysis bounds with one R-tree query
+        # rather than testing every POI against the extent
+        aoi = next(iter(clipped_data.values()))['bounds']
+        hits = np.sort(self.poi_tree.query(shapely.box(*aoi)))
+        pois = pois.iloc[hits]
+
+        # POI coordinates as flat arrays (centroid of a Point is the Point
+        # itself, so this handles mixed geometry types without branching)
+        centroids = pois.geometry.centroid
+        xs = centroids.x.to_numpy()
+        ys = centroids.y.to_numpy()
+
+        result = pd.DataFrame({
+            'poi_id': pois.index,
+            'poi_name': (pois['name'].fillna('Unknown')
+                         if 'name' in pois.columns else 'Unknown'),
+            'poi_category': (pois['category'].fillna('Unknown')
+                             if 'category' in pois.columns else 'Unknown'),
+            'latitude': ys,
+            'longitude': xs
+        })
+
+        # Extract population data from each raster, vectorized over all POIs
+        for dataset_name, data_info in clipped_data.items():
+            # Already NaN-free: zero-filled when the raster was clipped
+            data = data_info['data']
+
+            # Invert the affine once per dataset and unpack its coefficients
+            # into locals, leaving the row/col math as plain array arithmetic
+            # with no per-term attribute lookups
+            ia, ib, ic, id_, ie, if_ = tuple(~data_info['transform'])[:6]
+            cols = (ia * xs + ib * ys + ic).astype(np.int64)
+            rows = (id_ * xs + ie * ys + if_).astype(np.int64)
+            in_bounds = ((rows >= 0) & (rows < data.shape[0]) &
+                         (cols >= 0) & (cols < data.shape[1]))
+
+            # Population value at each POI location
+            at_location = np.zeros(len(pois))
+            at_location[in_bounds] = data[rows[in_bounds], cols[in_bounds]]
+
+            # Population in the buffer around each POI. The buffer size
+            # depends on resolution; all POIs share it today, so this hits
+            # the summed-area-table path inside poi_buffer_sums.
+            resolution = data_info['resolution'][0]  # degrees
+            buffer_cells = max(1, int(0.002 / resolution))  # ~200m buffer
+            radii = np.full(rows.size, buffer_cells, dtype=np.int64)
+            buffer_sum = poi_buffer_sums(data, rows, cols, radii)
+
+            result[f'{dataset_name}_at_location'] = at_location
+            result[f'{dataset_name}_in_buffer'] = np.where(in_bounds, buffer_sum, 0.0)
+
+        return result
 
 def main():
     """Main processing function with real data only"""
@@ -309,7 +552,7 @@ def main():
     
     # Download real WorldPop data
     logger.info("Attempting to download real WorldPop data...")
-    raster_files = processor.download_real_worldpop_data(year=2020)
+    raster_files = processor.download_real_worldpop_data(year=2020, bounds=bounds)
     
     if not raster_files:
         logger.error("Failed to download any real WorldPop data")
@@ -341,11 +584,12 @@ def main():
     # Create summary
     summary = {}
     for dataset_name, data_info in clipped_data.items():
+        # Arrays are zero-filled at clip time, so plain reductions suffice
         data = data_info['data']
         summary[dataset_name] = {
-            'total_population': float(np.sum(data[~np.isnan(data)])),
-            'max_density': float(np.max(data[~np.isnan(data)])),
-            'mean_density': float(np.mean(data[~np.isnan(data)])),
+            'total_population': float(data.sum(dtype=np.float64)),
+            'max_density': float(data.max()),
+            'mean_density': float(data.mean(dtype=np.float64)),
             'resolution_degrees': data_info['resolution'][0],
             'resolution_meters': data_info['resolution'][0] * 111000  # approximate
         }
@@ -1,111 +1,167 @@
 import pandas as pd
 import geopandas as gpd
 import folium
-from folium import plugins
 import numpy as np
 import rasterio
+from rasterio.windows import from_bounds
+from rasterio.coords import BoundingBox
+from matplotlib import colormaps
 from pathlib import Path
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def load_population_raster():
-    """Load the population raster data for Koramangala"""
+# Population density buckets for the grid overlay (upper bin edges) with the
+# color and opacity looked up per bucket
+GRID_POP_BINS = np.array([10, 30, 50])
+GRID_COLOR_LUT = np.array(['#ffffcc', '#fed976', '#fd8d3c', '#e31a1c'])
+GRID_OPACITY_LUT = np.array([0.3, 0.4, 0.5, 0.6])
+
+def load_population_raster(aoi=None):
+    """Load the population raster data for Koramangala
+
+    When an aoi (minx, miny, maxx, maxy) is given, only that window is
+    read, so memory stays proportional to the area of interest rather
+    than the whole file.
+    """
+    # Prefer the chunked Zarr store written by script 09: opening it costs
+    # only a metadata read and it is already clipped to the AOI
+    zarr_store = Path('data/worldpop_real/total_population.zarr')
+    if zarr_store.exists():
+        try:
+            import zarr
+            z = zarr.open(str(zarr_store), mode='r')
+            transform = rasterio.Affine(*z.attrs['transform'])
+            bounds = BoundingBox(*z.attrs['bounds'])
+            population_data = np.nan_to_num(np.asarray(z), copy=False)
+            logger.info(f"Loaded population Zarr store: {population_data.shape}")
+            return population_data, bounds, transform
+        except Exception as e:
+            logger.warning(f"Could not read Zarr store, falling back to GeoTIFF: {e}")
+
     raster_file = Path('data/worldpop/koramangala_total_population.tif')
-    
+
     if not raster_file.exists():
         logger.error(f"Population raster not found: {raster_file}")
         return None, None, None
-    
+
     with rasterio.open(raster_file) as src:
-        population_data = src.read(1)
-        bounds = src.bounds
-        transform = src.transform
-        
+        if aoi is not None:
+            window = from_bounds(*aoi, transform=src.transform)
+            window = window.intersection(rasterio.windows.Window(
+                0, 0, src.width, src.height))
+            # float32 halves memory traffic on the downstream reductions
+            population_data = src.read(1, window=window, out_dtype='float32')
+            transform = src.window_transform(window)
+            bounds = BoundingBox(*rasterio.windows.bounds(window, src.transform))
+        else:
+            population_data = src.read(1, out_dtype='float32')
+            bounds = src.bounds
+            transform = src.transform
+
+    # Zero-fill NaNs once here; all downstream sums and means can then run
+    # on the raw array without building boolean masks
+    population_data = np.nan_to_num(population_data, copy=False)
     logger.info(f"Loaded population raster: {population_data.shape}")
     return population_data, bounds, transform
 
-def create_population_heatmap_data(population_data, bounds, transform):
-    """Convert raster data to format suitable for folium heatmap"""
-    
-    heat_data = []
-    
-    # Get raster dimensions
-    height, width = population_data.shape
-    
-    # Convert each cell to lat/lon coordinates with population value
-    for row in range(height):
-        for col in range(width):
-            pop_value = population_data[row, col]
-            
-            # Skip cells with no population
-            if pop_value <= 0:
-                continue
-            
-            # Convert pixel coordinates to geographic coordinates
-            lon, lat = rasterio.transform.xy(transform, row, col)
-            
-            # Add multiple points based on population density for better heatmap effect
-            intensity = min(int(pop_value), 10)  # Cap intensity for visualization
-            for _ in range(intensity):
-                heat_data.append([lat, lon])
-    
-    logger.info(f"Created heatmap data with {len(heat_data)} points")
-    return heat_data
+def create_population_image_overlay(population_data, bounds):
+    """Render the population raster as a single RGBA image overlay
+
+    Ships one PNG-sized array to the browser instead of expanding every
+    pixel into a list of heatmap points.
+    """
+    data = population_data.astype(np.float32)
+
+    # Normalize against the 99th percentile so a few dense cells don't
+    # wash out the color ramp
+    positive = data[data > 0]
+    scale = np.percentile(positive, 99) if positive.size else 1.0
+    img = np.clip(data / max(scale, 1e-9), 0, 1)
+
+    rgba = colormaps['YlOrRd'](img)
+    # Fully transparent where there is no population
+    rgba[..., 3] = np.where(data > 0, 1.0, 0.0)
+
+    overlay = folium.raster_layers.ImageOverlay(
+        image=rgba,
+        bounds=[[bounds.bottom, bounds.left], [bounds.top, bounds.right]],
+        opacity=0.6,
+        origin='upper',
+        name='Population Density'
+    )
+    logger.info("Created population image overlay")
+    return overlay
 
 def create_population_grid_overlay(population_data, bounds, transform):
     """Create a grid overlay showing population density"""
     
     height, width = population_data.shape
-    grid_features = []
-    
+
     # Sample every nth cell to avoid too many polygons
     step = max(1, min(height, width) // 20)  # Create roughly 20x20 grid
-    
-    for row in range(0, height, step):
-        for col in range(0, width, step):
-            # Get population value for this cell
-            pop_values = population_data[row:row+step, col:col+step]
-            avg_pop = np.mean(pop_values)
-            
-            if avg_pop <= 0:
-                continue
-            
-            # Get cell bounds
-            left, top = rasterio.transform.xy(transform, row, col)
-            right, bottom = rasterio.transform.xy(transform, row+step, col+step)
-            
-            # Create rectangle coordinates
-            coordinates = [
-                [top, left],
-                [top, right], 
-                [bottom, right],
-                [bottom, left],
-                [top, left]
-            ]
-            
-            # Determine color based on population density
-            if avg_pop < 10:
-                color = '#ffffcc'
-                opacity = 0.3
-            elif avg_pop < 30:
-                color = '#fed976'
-                opacity = 0.4
-            elif avg_pop < 50:
-                color = '#fd8d3c'
-                opacity = 0.5
-            else:
-                color = '#e31a1c'
-                opacity = 0.6
-            
-            grid_features.append({
-                'coordinates': coordinates,
-                'population': avg_pop,
+
+    # Aggregate the raster into step x step blocks with one reshape-based
+    # reduction instead of a Python-level mean per grid cell. The array is
+    # NaN-free by construction (zero-filled at load), so zero padding plus
+    # geometric cell counts give exact block means with no masking.
+    pad_h = (-height) % step
+    pad_w = (-width) % step
+    padded = np.pad(population_data.astype(np.float32, copy=False),
+                    ((0, pad_h), (0, pad_w)))
+    blocks = padded.reshape(padded.shape[0] // step, step,
+                            padded.shape[1] // step, step)
+    # float64 accumulator keeps block sums exact over float32 input
+    sums = blocks.sum(axis=(1, 3), dtype=np.float64)
+    rows_in = np.minimum(step, height - np.arange(sums.shape[0]) * step)
+    cols_in = np.minimum(step, width - np.arange(sums.shape[1]) * step)
+    grid = sums / np.outer(rows_in, cols_in)
+
+    # Corner coordinates straight from the affine axes: these rasters are
+    # north-up, so all column longitudes and row latitudes come from two
+    # 1D multiplications instead of a transform.xy call per corner
+    a, _, c, _, e, f = tuple(transform)[:6]
+    x_edges = c + a * np.arange(grid.shape[1] + 1) * step
+    y_edges = f + e * np.arange(grid.shape[0] + 1) * step
+    lefts = np.tile(x_edges[:-1], grid.shape[0])
+    rights = np.tile(x_edges[1:], grid.shape[0])
+    tops = np.repeat(y_edges[:-1], grid.shape[1])
+    bottoms = np.repeat(y_edges[1:], grid.shape[1])
+
+    # Bucket color and opacity for all cells at once: digitize plus two
+    # lookup tables instead of an if/elif chain per cell
+    flat = grid.ravel()
+    bucket = np.digitize(flat, GRID_POP_BINS)
+    colors = GRID_COLOR_LUT[bucket]
+    opacities = GRID_OPACITY_LUT[bucket]
+
+    # Emit GeoJSON features so the map can render the whole grid as one layer
+    grid_features = []
+    for avg_pop, color, opacity, left, top, right, bottom in zip(
+            flat, colors, opacities, lefts, tops, rights, bottoms):
+        if avg_pop <= 0:
+            continue
+
+        # Rectangle ring in GeoJSON (lon, lat) order
+        ring = [
+            [left, top],
+            [right, top],
+            [right, bottom],
+            [left, bottom],
+            [left, top]
+        ]
+
+        grid_features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Polygon', 'coordinates': [ring]},
+            'properties': {
+                'population': round(float(avg_pop), 1),
                 'color': color,
-                'opacity': opacity
-            })
-    
+                'opacity': float(opacity)
+            }
+        })
+
     logger.info(f"Created {len(grid_features)} grid cells")
     return grid_features
 
@@ -140,41 +196,41 @@ def create_population_overlay_map():
         tiles='OpenStreetMap'
     )
     
-    # Load and add population raster overlay
-    population_data, bounds, transform = load_population_raster()
+    # Load and add population raster overlay, windowed to the POI extent
+    # plus a small margin
+    minx, miny, maxx, maxy = pois.total_bounds
+    aoi = (minx - 0.005, miny - 0.005, maxx + 0.005, maxy + 0.005)
+    population_data, bounds, transform = load_population_raster(aoi)
     
     if population_data is not None:
-        # Method 1: Add heatmap layer
-        logger.info("Adding population heatmap layer...")
-        heat_data = create_population_heatmap_data(population_data, bounds, transform)
-        
-        if heat_data:
-            heat_map = plugins.HeatMap(
-                heat_data,
-                name='Population Density Heatmap',
-                radius=15,
-                blur=10,
-                gradient={0.2: 'blue', 0.4: 'cyan', 0.6: 'lime', 0.8: 'yellow', 1.0: 'red'}
-            )
-            heat_map.add_to(m)
-        
+        # Method 1: Add the raster itself as an image overlay
+        logger.info("Adding population image overlay...")
+        create_population_image_overlay(population_data, bounds).add_to(m)
+
         # Method 2: Add grid overlay (alternative visualization)
         logger.info("Adding population grid overlay...")
         grid_features = create_population_grid_overlay(population_data, bounds, transform)
         
         # Create a feature group for grid cells
         grid_group = folium.FeatureGroup(name='Population Grid', show=False)
-        
-        for feature in grid_features:
-            folium.Polygon(
-                locations=feature['coordinates'],
-                popup=f"Avg Population: {feature['population']:.1f}",
-                color='black',
-                weight=1,
-                fillColor=feature['color'],
-                fillOpacity=feature['opacity']
+
+        # One GeoJson layer for the whole grid: a single JSON dump instead of
+        # a Leaflet polygon object per cell
+        if grid_features:
+            folium.GeoJson(
+                {'type': 'FeatureCollection', 'features': grid_features},
+                style_function=lambda f: {
+                    'color': 'black',
+                    'weight': 1,
+                    'fillColor': f['properties']['color'],
+                    'fillOpacity': f['properties']['opacity']
+                },
+                tooltip=folium.GeoJsonTooltip(
+                    fields=['population'],
+                    aliases=['Avg Population:']
+                )
             ).add_to(grid_group)
-        
+
         grid_group.add_to(m)
     
     # Add POI layer with population context
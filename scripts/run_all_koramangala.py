@@ -1,6 +1,7 @@
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 def run_script(script_name):
@@ -26,21 +27,31 @@ def main():
     print("🚀 Koramangala OSM Data Processing Pipeline")
     print("=" * 50)
     
-    scripts = [
-        "01_extract_koramangala.py",
-        "02_process_pois.py", 
-        "03_process_roads.py",
-        "04_create_business_datasets.py"
-    ]
-    
     total_start = time.time()
-    
-    for script in scripts:
-        success = run_script(script)
-        if not success:
-            print(f"\n❌ Pipeline failed at: {script}")
-            return False
-    
+
+    # Extraction must finish first
+    if not run_script("01_extract_koramangala.py"):
+        print(f"\n❌ Pipeline failed at: 01_extract_koramangala.py")
+        return False
+
+    # POIs and roads touch independent datasets, so their scripts run as
+    # concurrent subprocesses; each child is its own interpreter, so the
+    # threads here only wait on them
+    parallel_scripts = ["02_process_pois.py", "03_process_roads.py"]
+    with ThreadPoolExecutor(max_workers=len(parallel_scripts)) as executor:
+        futures = {script: executor.submit(run_script, script)
+                   for script in parallel_scripts}
+    failed = [script for script, future in futures.items()
+              if not future.result()]
+    if failed:
+        print(f"\n❌ Pipeline failed at: {', '.join(failed)}")
+        return False
+
+    # Business datasets consume the processed POIs
+    if not run_script("04_create_business_datasets.py"):
+        print(f"\n❌ Pipeline failed at: 04_create_business_datasets.py")
+        return False
+
     total_duration = time.time() - total_start
     
     print(f"\n🎉 Pipeline completed successfully!")
@@ -1,30 +1,102 @@
+import hashlib
+import json
 import yaml
 import pandas as pd
-import geopandas as gpd
-import osmnx as ox
 from pathlib import Path
 import logging
 
+try:
+    import pyogrio  # C-level GeoJSON writes, much faster than fiona
+except ImportError:
+    pyogrio = None
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Configure OSMnx
-ox.config(use_cache=True, log_console=False)
+def _osmnx():
+    """Import and configure OSMnx on first use
+
+    Importing OSMnx pulls in the whole GIS stack and takes seconds, so
+    scripts that only use the save/clean helpers shouldn't pay for it.
+    """
+    import osmnx as ox
+    if not getattr(_osmnx, '_configured', False):
+        ox.config(use_cache=True, log_console=False)
+        _osmnx._configured = True
+    return ox
 
 def load_config():
     """Load configuration"""
     with open('config/koramangala_config.yaml', 'r') as f:
         return yaml.safe_load(f)
 
+# Amenity -> category lookup, applied in one .map pass in categorize_pois
+AMENITY_CATEGORIES = {
+    'restaurant': 'food_beverage', 'cafe': 'food_beverage',
+    'bar': 'food_beverage', 'fast_food': 'food_beverage',
+    'food_court': 'food_beverage',
+    'hospital': 'healthcare', 'clinic': 'healthcare',
+    'pharmacy': 'healthcare', 'dentist': 'healthcare',
+    'school': 'education', 'university': 'education',
+    'college': 'education', 'library': 'education',
+    'bank': 'financial', 'atm': 'financial',
+    'fuel': 'transport', 'parking': 'transport', 'bus_station': 'transport',
+}
+
+# Tag columns the downstream scripts actually consume; other OSM tags are
+# sparse noise that balloons the saved files and every later read
+POI_KEEP_COLUMNS = ['name', 'amenity', 'shop', 'tourism', 'cuisine', 'opening_hours',
+                    'phone', 'website', 'takeaway', 'delivery', 'emergency', 'brand',
+                    'category', 'addr:street', 'addr:housenumber', 'addr:postcode']
+
+def strip_sparse_columns(gdf, keep=None, min_coverage=0.01):
+    """Drop mostly-empty OSM tag columns before saving
+
+    Keeps geometry, everything in `keep`, and any column with more than
+    min_coverage non-null values.
+    """
+    if gdf is None or len(gdf) == 0:
+        return gdf
+
+    keep = set(keep or [])
+    keep.add('geometry')
+    coverage = gdf.notna().mean()
+    columns = [c for c in gdf.columns if c in keep or coverage[c] > min_coverage]
+
+    dropped = len(gdf.columns) - len(columns)
+    if dropped:
+        logger.info(f"Dropped {dropped} sparse tag columns")
+    return gdf[columns]
+
 def save_geospatial_data(gdf, filename, output_dir):
-    """Save GeoDataFrame as GeoJSON"""
+    """Save GeoDataFrame as GeoParquet (primary) plus GeoJSON for inspection"""
     if gdf is None or len(gdf) == 0:
         logger.warning(f"No data to save for {filename}")
         return
-    
+
+    # GeoParquet is the primary format: columnar, compressed, and several
+    # times faster to re-read downstream than text GeoJSON
+    parquet_path = Path(output_dir) / f"{filename}.parquet"
+    try:
+        gdf.to_parquet(parquet_path, compression='zstd')
+        logger.info(f"Saved {filename}: {len(gdf)} features -> {parquet_path}")
+    except Exception as e:
+        logger.warning(f"Could not write GeoParquet for {filename}: {e}")
+
+    # Keep GeoJSON alongside for debugging and external tools.
+    # OGR drivers don't understand pandas' category dtype, so widen those
+    # columns back to object for this write only (parquet keeps them).
+    category_columns = gdf.select_dtypes(include=['category']).columns
+    geojson_gdf = gdf.assign(**{col: gdf[col].astype(object)
+                                for col in category_columns})
     output_path = Path(output_dir) / f"{filename}.geojson"
-    gdf.to_file(output_path, driver='GeoJSON')
+    if pyogrio is not None:
+        # Writes over the underlying arrays in one C call instead of
+        # boxing every feature into a Python dict on the way to OGR
+        pyogrio.write_dataframe(geojson_gdf, str(output_path), driver='GeoJSON')
+    else:
+        geojson_gdf.to_file(output_path, driver='GeoJSON')
     logger.info(f"Saved {filename}: {len(gdf)} features -> {output_path}")
 
 def save_tabular_data(gdf, filename, output_dir):
@@ -35,45 +107,67 @@ def save_tabular_data(gdf, filename, output_dir):
     
     # Create tabular version
     df = gdf.copy()
-    
-    # Extract coordinates
-    if 'Point' in df.geometry.type.values:
-        point_mask = df.geometry.type == 'Point'
-        df.loc[point_mask, 'longitude'] = df.loc[point_mask, 'geometry'].x
-        df.loc[point_mask, 'latitude'] = df.loc[point_mask, 'geometry'].y
-    
-    # For other geometries, use centroid
-    non_point_mask = df.geometry.type != 'Point'
-    if non_point_mask.any():
-        centroids = df.loc[non_point_mask, 'geometry'].centroid
-        df.loc[non_point_mask, 'longitude'] = centroids.x
-        df.loc[non_point_mask, 'latitude'] = centroids.y
-    
+
+    # Centroid of a Point is the Point itself, so one vectorized pass
+    # covers every geometry type without masked .loc writes
+    centroids = df.geometry.centroid
+    df['longitude'] = centroids.x.to_numpy()
+    df['latitude'] = centroids.y.to_numpy()
+
     # Drop geometry and save
-    df = df.drop(columns=['geometry'])
-    df = pd.DataFrame(df)
+    df = pd.DataFrame(df.drop(columns=['geometry']))
     
     output_path = Path(output_dir) / f"{filename}.csv"
     df.to_csv(output_path, index=False)
     logger.info(f"Saved {filename} CSV: {len(df)} records -> {output_path}")
 
+def _extraction_cache_path(kind, area_name, params):
+    """Parquet cache path keyed by the extraction query"""
+    key = hashlib.sha1(
+        f'{area_name}|{json.dumps(params, sort_keys=True)}'.encode()
+    ).hexdigest()[:12]
+    return Path('data/raw') / f'{kind}_{key}.parquet'
+
+def _stringify_list_columns(gdf):
+    """Convert list-valued cells to strings so parquet can store them"""
+    for col in gdf.select_dtypes(include=['object']).columns:
+        types = gdf[col].map(type)
+        if (types == list).any():
+            gdf[col] = gdf[col].where(types != list, gdf[col].astype(str))
+    return gdf
+
 def extract_pois(area_name):
     """Extract Points of Interest for the area"""
     logger.info(f"Extracting POIs for: {area_name}")
-    
+
     # Define POI tags
     poi_tags = {
-        'amenity': ['restaurant', 'cafe', 'bar', 'fast_food', 'food_court', 
+        'amenity': ['restaurant', 'cafe', 'bar', 'fast_food', 'food_court',
                    'hospital', 'clinic', 'pharmacy', 'dentist',
                    'school', 'university', 'college', 'library',
                    'bank', 'atm', 'fuel', 'parking', 'bus_station'],
         'shop': True,  # All shop types
         'tourism': ['hotel', 'guest_house']
     }
-    
+
+    # Repeat runs read the parquet cache instead of hitting Overpass and
+    # re-parsing the response; the key changes with the area or tags
+    cache_path = _extraction_cache_path('pois', area_name, poi_tags)
+    if cache_path.exists():
+        import geopandas as gpd
+        logger.info(f"Loading cached POIs from {cache_path}")
+        return gpd.read_parquet(cache_path)
+
     try:
+        ox = _osmnx()
         pois = ox.geometries_from_place(area_name, poi_tags)
         logger.info(f"Extracted {len(pois)} POIs")
+        pois = _stringify_list_columns(pois)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            pois.to_parquet(cache_path)
+        except Exception as e:
+            logger.warning(f"Could not cache POIs: {e}")
         return pois
     except Exception as e:
         logger.error(f"Error extracting POIs: {e}")
@@ -82,8 +176,19 @@ def extract_pois(area_name):
 def extract_roads(area_name):
     """Extract road network for the area"""
     logger.info(f"Extracting roads for: {area_name}")
-    
+
+    edges_cache = _extraction_cache_path('road_edges', area_name,
+                                         {'network_types': ['drive', 'all']})
+    nodes_cache = _extraction_cache_path('road_nodes', area_name,
+                                         {'network_types': ['drive', 'all']})
+    if edges_cache.exists() and nodes_cache.exists():
+        import geopandas as gpd
+        logger.info(f"Loading cached roads from {edges_cache}")
+        return gpd.read_parquet(edges_cache), gpd.read_parquet(nodes_cache)
+
     try:
+        ox = _osmnx()
+
         # Try different network types
         for net_type in ['drive', 'all']:
             try:
@@ -98,16 +203,18 @@ def extract_roads(area_name):
         # Convert to GeoDataFrames
         nodes, edges = ox.graph_to_gdfs(G)
         
-        # Clean up any list columns in edges
-        for col in edges.columns:
-            if edges[col].dtype == 'object':
-                try:
-                    if any(isinstance(x, list) for x in edges[col].dropna().head(10)):
-                        edges[col] = edges[col].apply(lambda x: str(x) if isinstance(x, list) else x)
-                except:
-                    pass
-        
+        # Clean up any list columns in edges; one typed pass per column
+        # rather than sampling the first 10 rows, which could miss list
+        # values further down
+        edges = _stringify_list_columns(edges)
+
         logger.info(f"Extracted {len(edges)} road edges and {len(nodes)} nodes")
+        try:
+            edges_cache.parent.mkdir(parents=True, exist_ok=True)
+            edges.to_parquet(edges_cache)
+            _stringify_list_columns(nodes).to_parquet(nodes_cache)
+        except Exception as e:
+            logger.warning(f"Could not cache roads: {e}")
         return edges, nodes
         
     except Exception as e:
@@ -120,20 +227,22 @@ def categorize_pois(pois_gdf):
         return pois_gdf
     
     df = pois_gdf.copy()
-    df['category'] = 'other'
-    
-    # Categorize based on amenity
+
+    # One dict-mapped pass over amenity instead of a boolean-mask scan
+    # per category
     if 'amenity' in df.columns:
-        df.loc[df['amenity'].isin(['restaurant', 'cafe', 'bar', 'fast_food', 'food_court']), 'category'] = 'food_beverage'
-        df.loc[df['amenity'].isin(['hospital', 'clinic', 'pharmacy', 'dentist']), 'category'] = 'healthcare'
-        df.loc[df['amenity'].isin(['school', 'university', 'college', 'library']), 'category'] = 'education'
-        df.loc[df['amenity'].isin(['bank', 'atm']), 'category'] = 'financial'
-        df.loc[df['amenity'].isin(['fuel', 'parking', 'bus_station']), 'category'] = 'transport'
-    
+        df['category'] = df['amenity'].map(AMENITY_CATEGORIES).fillna('other')
+    else:
+        df['category'] = 'other'
+
     # Categorize shops
     if 'shop' in df.columns:
         df.loc[df['shop'].notna(), 'category'] = 'retail'
-    
+
+    # category dtype: value_counts/groupby become integer code histograms
+    # instead of hashing every string, here and in every downstream script
+    df['category'] = df['category'].astype('category')
+
     logger.info(f"Categorized POIs: {df['category'].value_counts().to_dict()}")
     return df
 
@@ -147,17 +256,20 @@ def clean_data(gdf):
     # Remove invalid geometries
     gdf = gdf[gdf.geometry.is_valid]
     
-    # Remove duplicates
-    gdf = gdf.drop_duplicates(subset=['geometry'])
+    # Remove duplicates on WKB bytes: shapely geometries hash by identity,
+    # so deduping on the geometry column itself misses true duplicates
+    wkb = gdf.geometry.to_wkb()
+    gdf = gdf.loc[~pd.Series(wkb, index=gdf.index).duplicated()]
     
-    # Clean text fields
-    text_columns = gdf.select_dtypes(include=['object']).columns
+    # Clean text fields. Strip only columns that actually hold strings;
+    # .str.strip skips missing values, whereas the old astype(str) pass
+    # rewrote every column and turned NaN into the literal 'nan'
+    text_columns = [c for c in gdf.select_dtypes(include=['object']).columns
+                    if c != 'geometry']
     for col in text_columns:
-        if col != 'geometry':
-            try:
-                gdf[col] = gdf[col].astype(str).str.strip()
-            except:
-                pass
+        values = gdf[col].dropna()
+        if len(values) and values.map(type).eq(str).all():
+            gdf[col] = gdf[col].str.strip()
     
     cleaned_count = len(gdf)
     if initial_count != cleaned_count: